@@ -8,6 +8,8 @@ from typing import Optional, List, TypeVar
 from google import genai
 from google.genai import types
 from .config import settings
+from .budget import BudgetGovernor, TIER_FREE, TIER_PAID
+from .registry import Registry
 
 logger = logging.getLogger(__name__)
 
@@ -16,51 +18,73 @@ T = TypeVar("T")
 class KeyExhaustedError(Exception):
     pass
 
+class TokenCountMismatch(Exception):
+    """Raised when count_tokens shows the item no longer fits the current tier."""
+    def __init__(self, tokens: int):
+        super().__init__(f"Item needs {tokens} tokens, re-routing.")
+        self.tokens = tokens
+
 class KeyManager:
     def __init__(self):
         self.free_keys = settings.GOOGLE_KEYS_FREE.copy()
         self.paid_keys = settings.GOOGLE_KEYS_PAID.copy()
         self.bad_keys = set()
         
-    def get_next_key(self) -> Optional[str]:
-        for key in self.free_keys:
-            if key not in self.bad_keys: return key
-        if self.bad_keys.issuperset(set(self.free_keys)):
-            if self.free_keys and any(k not in self.bad_keys for k in self.paid_keys):
-                 logger.info("Free tier keys exhausted. Switching to Paid tier.")
+    def tier_of(self, key: str) -> str:
+        return TIER_FREE if key in self.free_keys else TIER_PAID
+
+    def get_next_key(self, tiers: Optional[List[str]] = None) -> Optional[str]:
+        """Returns the first usable key, searching the given tiers in order."""
+        tiers = tiers or [TIER_FREE, TIER_PAID]
+        if TIER_FREE in tiers:
+            for key in self.free_keys:
+                if key not in self.bad_keys: return key
+        if TIER_PAID in tiers:
             for key in self.paid_keys:
                 if key not in self.bad_keys: return key
         return None
 
+    def preferred_tier(self, tiers: List[str]) -> Optional[str]:
+        """Returns the first of the given tiers that still has a usable key."""
+        key = self.get_next_key(tiers)
+        return self.tier_of(key) if key else None
+
     def mark_as_failed(self, key: str):
         if key:
             logger.warning(f"Marking API Key as exhausted/failed: ...{key[-4:]}")
             self.bad_keys.add(key)
 
 class AudioAnalyzer:
-    def __init__(self):
+    def __init__(self, registry: Registry):
         self.key_manager = KeyManager()
+        self.governor = BudgetGovernor(registry)
         self.current_client: Optional[genai.Client] = None
         self.current_key: Optional[str] = None
+        self.current_tier: Optional[str] = None
         if not self._rotate_client():
             logger.warning("No valid API keys available on startup.")
 
-    def _rotate_client(self) -> bool:
-        new_key = self.key_manager.get_next_key()
+    def _rotate_client(self, tiers: Optional[List[str]] = None) -> bool:
+        new_key = self.key_manager.get_next_key(tiers)
         if not new_key: return False
+        new_tier = self.key_manager.tier_of(new_key)
+        if self.current_tier == TIER_FREE and new_tier == TIER_PAID:
+            logger.info("Switching from Free to Paid tier.")
         self.current_key = new_key
+        self.current_tier = new_tier
         try:
             self.current_client = genai.Client(api_key=new_key)
-            logger.info(f"Switched to API Key ending in ...{new_key[-4:]}")
+            logger.info(f"Switched to {self.current_tier} API Key ending in ...{new_key[-4:]}")
             return True
         except Exception as e:
             logger.error(f"Failed to initialize client: {e}")
             self.key_manager.mark_as_failed(new_key)
-            return self._rotate_client()
+            return self._rotate_client(tiers)
 
     def _find_best_model(self) -> str:
-        if settings.GOOGLE_MODEL:
-            return settings.GOOGLE_MODEL
+        tier_model = self.governor.model_for(self.current_tier)
+        if tier_model:
+            return tier_model
         try:
             all_models = list(self.current_client.models.list())
             priorities = [
@@ -90,7 +114,7 @@ class AudioAnalyzer:
                 logger.warning(f"Failed to read prompts.yaml: {e}")
         return "Task 1: Transcript. Task 2: Summary. Keep original language."
 
-    def _run_full_analysis_transaction(self, file_path: Path):
+    def _run_full_analysis_transaction(self, file_path: Path, estimated_tokens: int):
         mime_type, _ = mimetypes.guess_type(file_path)
         if not mime_type:
             if file_path.suffix == '.mp3': mime_type = 'audio/mpeg'
@@ -115,12 +139,28 @@ class AudioAnalyzer:
 
             model_name = self._find_best_model()
             prompt_text = self._load_prompt()
-            
+
+            counted = None
+            if settings.COUNT_TOKENS:
+                counted = self.current_client.models.count_tokens(
+                    model=model_name,
+                    contents=[file_ref, prompt_text]
+                ).total_tokens
+                logger.info(f"count_tokens: {counted} (estimated {estimated_tokens}, audio + prompt)")
+                if counted and not self.governor.fits(self.current_tier, counted):
+                    raise TokenCountMismatch(counted)
+
             logger.info(f"Requesting analysis from {model_name}...")
             response = self.current_client.models.generate_content(
                 model=model_name,
                 contents=[file_ref, prompt_text]
             )
+
+            usage = response.usage_metadata
+            input_tokens = (usage and usage.prompt_token_count) or counted or estimated_tokens
+            # Thinking tokens are billed as output
+            output_tokens = ((usage and usage.candidates_token_count) or 0) + ((usage and usage.thoughts_token_count) or 0)
+            self.governor.record(self.current_tier, input_tokens, output_tokens)
             return response.text
         finally:
             if file_ref and self.current_client:
@@ -128,12 +168,32 @@ class AudioAnalyzer:
                     self.current_client.files.delete(name=file_ref.name)
                 except Exception: pass
 
-    def analyze(self, file_path: Path) -> str:
+    def analyze(self, file_path: Path, bitrate: Optional[str] = None) -> str:
+        """
+        Analyzes one audio file on the cheapest tier that fits.
+        `bitrate` is the encoding bitrate if we produced the file (size-based estimate fallback).
+        """
+        estimated_tokens = (self.governor.estimate_tokens(file_path, bitrate)
+                            + self.governor.estimate_text_tokens(self._load_prompt()))
+        logger.info(f"Estimated ~{estimated_tokens} input tokens for {file_path.name}")
         while True:
+            # Re-checked on every attempt: budgets shrink as other items complete
+            tiers = self.governor.allowed_tiers(estimated_tokens)
+            # Never run on a tier that is not allowed; switch back to the
+            # preferred tier as soon as it has a usable key again
+            preferred_tier = self.key_manager.preferred_tier(tiers)
+            if self.current_client and self.current_tier != preferred_tier:
+                if preferred_tier:
+                    logger.info(f"Routing {file_path.name} to {preferred_tier} tier.")
+                self.current_client = None
             if not self.current_client:
-                if not self._rotate_client(): raise KeyExhaustedError("All API keys exhausted.")
+                if not self._rotate_client(tiers):
+                    raise KeyExhaustedError(f"All API keys exhausted for tiers: {', '.join(tiers)}.")
             try:
-                return self._run_full_analysis_transaction(file_path)
+                return self._run_full_analysis_transaction(file_path, estimated_tokens)
+            except TokenCountMismatch as e:
+                logger.info(str(e))
+                estimated_tokens = e.tokens
             except Exception as e:
                 error_str = str(e).lower()
                 if any(x in error_str for x in ["429", "403", "exhausted", "quota"]):
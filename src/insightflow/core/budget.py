@@ -0,0 +1,144 @@
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+from insightflow.core.config import settings
+from insightflow.core.registry import Registry
+
+logger = logging.getLogger(__name__)
+
+TIER_FREE = "free"
+TIER_PAID = "paid"
+
+# Typical bitrates used to guess duration from file size when ffprobe is missing.
+# Used for audio uploaded as-is; files we transcoded pass settings.AUDIO_BITRATE instead.
+FALLBACK_BITRATES = {
+    ".wav": "1411k",
+    ".flac": "900k",
+    ".mp3": "128k",
+    ".m4a": "128k",
+    ".aac": "128k",
+    ".ogg": "128k",
+}
+DEFAULT_BITRATE = "128k"
+
+class BudgetExceededError(Exception):
+    pass
+
+def probe_duration(file_path: Path) -> Optional[float]:
+    """Returns media duration in seconds using ffprobe, or None if unavailable."""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "json",
+        str(file_path)
+    ]
+    try:
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        return float(json.loads(result.stdout)["format"]["duration"])
+    except (OSError, subprocess.CalledProcessError, KeyError, ValueError) as e:
+        logger.warning(f"ffprobe failed for {file_path.name}: {e}")
+        return None
+
+def _bitrate_to_bps(bitrate: str) -> int:
+    """Parses an ffmpeg-style bitrate ('64k', '1M', '96000') into bits per second."""
+    value = bitrate.strip().lower()
+    multiplier = 1
+    if value.endswith("k"):
+        multiplier, value = 1000, value[:-1]
+    elif value.endswith("m"):
+        multiplier, value = 1000 * 1000, value[:-1]
+    bps = int(float(value) * multiplier)
+    if bps <= 0:
+        raise ValueError(f"Invalid bitrate: {bitrate}")
+    return bps
+
+class BudgetGovernor:
+    """
+    Estimates the token cost of an item before it is uploaded and decides
+    which key tier may take it:
+    - Items larger than the Free tier TPM limit go straight to Paid keys.
+    - Daily token/spend budgets per tier are enforced from Registry usage.
+    """
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+
+    def _fallback_bitrate(self, file_path: Path, bitrate: Optional[str] = None) -> int:
+        """Picks the bitrate used to guess duration from size, in bits per second."""
+        if not bitrate:
+            bitrate = FALLBACK_BITRATES.get(file_path.suffix.lower(), DEFAULT_BITRATE)
+        try:
+            return _bitrate_to_bps(bitrate)
+        except ValueError:
+            logger.warning(f"Invalid bitrate '{bitrate}'. Using {DEFAULT_BITRATE}.")
+            return _bitrate_to_bps(DEFAULT_BITRATE)
+
+    def estimate_tokens(self, file_path: Path, bitrate: Optional[str] = None) -> int:
+        """
+        Estimates audio tokens from media duration.
+        Without ffprobe, duration is guessed from file size and `bitrate`
+        (pass it for files we encoded ourselves; otherwise a per-format guess is used).
+        """
+        duration = probe_duration(file_path)
+        if duration is None:
+            duration = file_path.stat().st_size * 8 / self._fallback_bitrate(file_path, bitrate)
+            logger.info(f"Estimated duration from size: {duration:.0f}s")
+        return int(duration * settings.AUDIO_TOKENS_PER_SECOND)
+
+    def estimate_text_tokens(self, text: str) -> int:
+        """Rough token count for a text prompt (~4 characters per token)."""
+        return len(text) // 4 + 1
+
+    def estimate_cost(self, tier: str, input_tokens: int, output_tokens: Optional[int] = None) -> float:
+        """Returns the USD cost of a request. Free tier requests cost nothing."""
+        if tier == TIER_FREE:
+            return 0.0
+        if output_tokens is None:
+            output_tokens = settings.OUTPUT_TOKENS_RESERVE
+        return (input_tokens * settings.PRICE_INPUT_PER_M
+                + output_tokens * settings.PRICE_OUTPUT_PER_M) / 1_000_000
+
+    def fits(self, tier: str, input_tokens: int) -> bool:
+        """Checks whether an item of this size fits the tier's limits and remaining budget."""
+        # TPM counts input only; the output reserve applies to the daily budgets
+        total = input_tokens + settings.OUTPUT_TOKENS_RESERVE
+        usage = self.registry.get_usage(tier)
+
+        if tier == TIER_FREE:
+            if input_tokens > settings.FREE_TPM_LIMIT:
+                return False
+            daily_tokens = settings.FREE_DAILY_TOKENS
+        else:
+            daily_tokens = settings.PAID_DAILY_TOKENS
+            if settings.PAID_DAILY_USD:
+                cost = self.estimate_cost(tier, input_tokens)
+                if usage["cost_usd"] + cost > settings.PAID_DAILY_USD:
+                    return False
+
+        if daily_tokens and usage["tokens"] + total > daily_tokens:
+            return False
+        return True
+
+    def allowed_tiers(self, input_tokens: int) -> List[str]:
+        """Returns the tiers (in preference order) that can take an item of this size."""
+        tiers = [t for t in (TIER_FREE, TIER_PAID) if self.fits(t, input_tokens)]
+        if not tiers:
+            raise BudgetExceededError(
+                f"No tier can take ~{input_tokens} tokens within today's budget."
+            )
+        return tiers
+
+    def model_for(self, tier: str) -> Optional[str]:
+        """Returns the configured model for a tier, or None to use the default."""
+        if tier == TIER_FREE:
+            return settings.GOOGLE_MODEL_FREE or settings.GOOGLE_MODEL
+        return settings.GOOGLE_MODEL_PAID or settings.GOOGLE_MODEL
+
+    def record(self, tier: str, input_tokens: int, output_tokens: int):
+        """Stores actual usage of a completed request in the Registry."""
+        cost = self.estimate_cost(tier, input_tokens, output_tokens)
+        self.registry.record_usage(tier, input_tokens + output_tokens, cost)
+        logger.info(f"Usage [{tier}]: {input_tokens} in / {output_tokens} out, ${cost:.4f}")
@@ -45,6 +45,31 @@ class Settings:
         self.AUDIO_BITRATE = os.getenv("INSIGHTFLOW_AUDIO_BITRATE", "64k")
         self.AUDIO_CHANNELS = os.getenv("INSIGHTFLOW_AUDIO_CHANNELS", "1")  # 1=Mono, 2=Stereo
 
+        # --- Budget Governor ---
+        # Per-tier model overrides. Empty -> fall back to GOOGLE_MODEL / auto-detection.
+        self.GOOGLE_MODEL_FREE = os.getenv("GOOGLE_MODEL_FREE") or None
+        self.GOOGLE_MODEL_PAID = os.getenv("GOOGLE_MODEL_PAID") or None
+
+        # Gemini bills audio at a fixed rate of 32 tokens per second.
+        self.AUDIO_TOKENS_PER_SECOND = int(os.getenv("INSIGHTFLOW_AUDIO_TOKENS_PER_SECOND", 32))
+        # Tokens reserved for the model's answer (transcript + summary).
+        self.OUTPUT_TOKENS_RESERVE = int(os.getenv("INSIGHTFLOW_OUTPUT_TOKENS_RESERVE", 8192))
+        # Ask the API for an exact count after upload (one extra request per file).
+        self.COUNT_TOKENS = os.getenv("INSIGHTFLOW_COUNT_TOKENS", "false").lower() in ("1", "true", "yes")
+
+        # Free tier tokens-per-minute limit. Larger items go straight to Paid keys.
+        # Default matches gemini-2.0-flash-lite (1M TPM); use 250000 for gemini-2.5-flash.
+        self.FREE_TPM_LIMIT = int(os.getenv("INSIGHTFLOW_FREE_TPM_LIMIT", 1000000))
+
+        # Daily budgets per tier (0 = unlimited)
+        self.FREE_DAILY_TOKENS = int(os.getenv("INSIGHTFLOW_FREE_DAILY_TOKENS", 0))
+        self.PAID_DAILY_TOKENS = int(os.getenv("INSIGHTFLOW_PAID_DAILY_TOKENS", 0))
+        self.PAID_DAILY_USD = float(os.getenv("INSIGHTFLOW_PAID_DAILY_USD", 0))
+
+        # Paid tier pricing, USD per 1M tokens (defaults: gemini-2.0-flash-lite audio)
+        self.PRICE_INPUT_PER_M = float(os.getenv("INSIGHTFLOW_PRICE_INPUT_PER_M", 0.075))
+        self.PRICE_OUTPUT_PER_M = float(os.getenv("INSIGHTFLOW_PRICE_OUTPUT_PER_M", 0.30))
+
 # Create the singleton instance
 settings = Settings()
 
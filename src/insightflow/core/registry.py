@@ -8,10 +8,15 @@ import datetime
 logger = logging.getLogger(__name__)
 
 class Registry:
+    USAGE_KEY = "_usage"
+
     def __init__(self, registry_path: str = "data/registry.json"):
         # Resolve path relative to project root if it's relative
         # Assuming run from root, but we can make it robust
         self.path = Path(registry_path).resolve()
+        # Keys are file hashes, except the reserved USAGE_KEY which holds
+        # daily token/spend counters: {"_usage": {date: {tier: {...}}}}.
+        # Code iterating file records must skip it.
         self.data: Dict[str, Any] = {}
         self.load()
 
@@ -115,3 +120,19 @@ class Registry:
             # Even if rename fails, the task is logically complete in registry
             
         return new_path
+
+    def record_usage(self, tier: str, tokens: int, cost_usd: float = 0.0):
+        """Adds token usage and spend to today's counters for the given key tier."""
+        today = datetime.date.today().isoformat()
+        day = self.data.setdefault(self.USAGE_KEY, {}).setdefault(today, {})
+        counters = day.setdefault(tier, {"tokens": 0, "cost_usd": 0.0, "requests": 0})
+        counters["tokens"] += tokens
+        counters["cost_usd"] = round(counters["cost_usd"] + cost_usd, 6)
+        counters["requests"] += 1
+        self.save()
+
+    def get_usage(self, tier: str) -> Dict[str, Any]:
+        """Returns today's usage counters for the given key tier."""
+        today = datetime.date.today().isoformat()
+        day = self.data.get(self.USAGE_KEY, {}).get(today, {})
+        return day.get(tier, {"tokens": 0, "cost_usd": 0.0, "requests": 0})
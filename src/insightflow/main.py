@@ -49,7 +49,8 @@ def save_result_in_inbox(source_original_path: Path, text_content: str):
     logger.info(f"📝 Report saved: {report_path.name}")
     return report_path
 
-def process_file_item(original_file: Path, ingestor: LocalIngestor, analyzer: AudioAnalyzer, registry: Registry):
+def process_file_item(original_file: Path, ingestor: LocalIngestor, analyzer: AudioAnalyzer, registry: Registry,
+                      transcoded: bool = False):
     """
     Handles lifecycle of one item:
     1. Prepare (Get audio path, potentially temp)
@@ -57,6 +58,7 @@ def process_file_item(original_file: Path, ingestor: LocalIngestor, analyzer: Au
     3. Save MD
     4. Cleanup Temp
     5. Mark Done
+    `transcoded` means the source was already encoded with settings.AUDIO_BITRATE (e.g. YouTube download).
     """
     if registry.is_processed(original_file):
         logger.info(f"Skipping {original_file.name} (Already processed).")
@@ -74,7 +76,8 @@ def process_file_item(original_file: Path, ingestor: LocalIngestor, analyzer: Au
         audio_path_to_upload, is_temp = ingestor.prepare_for_analysis(original_file)
         
         # 2. Analyze
-        result_text = analyzer.analyze(audio_path_to_upload)
+        bitrate = settings.AUDIO_BITRATE if (is_temp or transcoded) else None
+        result_text = analyzer.analyze(audio_path_to_upload, bitrate=bitrate)
 
         if result_text:
             # 3. Save Report (Next to original)
@@ -114,7 +117,7 @@ def main():
     
     # Initialize Core Components
     try:
-        analyzer = AudioAnalyzer()
+        analyzer = AudioAnalyzer(registry=registry)
     except Exception:
         logger.error("Failed to initialize Analyzer. Check keys.")
         return
@@ -136,7 +139,7 @@ def main():
         if downloaded_file and downloaded_file.exists():
             # Process the specific file we just downloaded
             ingestor = LocalIngestor(inbox_path=settings.INSIGHTFLOW_INBOX)
-            process_file_item(downloaded_file, ingestor, analyzer, registry)
+            process_file_item(downloaded_file, ingestor, analyzer, registry, transcoded=True)
         else:
             logger.warning("Download failed or file not found.")
 
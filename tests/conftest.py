@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+import pytest
+from insightflow.core import analyzer as analyzer_module
+from insightflow.core.config import settings
+from insightflow.core.registry import Registry
+
+FREE_KEY = "free-key-0001"
+PAID_KEY = "paid-key-0002"
+
+
+class FakeClient:
+    """Stands in for genai.Client. Records which key served each request."""
+
+    calls = []
+    counted_tokens = None
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.files = SimpleNamespace(
+            upload=lambda file, config: SimpleNamespace(name="files/1", state=SimpleNamespace(name="ACTIVE")),
+            get=lambda name: None,
+            delete=lambda name: None,
+        )
+        self.models = SimpleNamespace(
+            generate_content=self._generate_content,
+            count_tokens=lambda model, contents: SimpleNamespace(total_tokens=FakeClient.counted_tokens),
+            list=lambda: [],
+        )
+
+    def _generate_content(self, model, contents):
+        FakeClient.calls.append(self.api_key)
+        return SimpleNamespace(
+            text="report",
+            usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=10, thoughts_token_count=5),
+        )
+
+
+@pytest.fixture
+def budget_settings(monkeypatch):
+    """Predictable budget settings independent of the local .env."""
+    values = {
+        "GOOGLE_KEYS_FREE": [FREE_KEY],
+        "GOOGLE_KEYS_PAID": [PAID_KEY],
+        "GOOGLE_MODEL": "test-model",
+        "GOOGLE_MODEL_FREE": None,
+        "GOOGLE_MODEL_PAID": None,
+        "AUDIO_BITRATE": "64k",
+        "AUDIO_TOKENS_PER_SECOND": 32,
+        "OUTPUT_TOKENS_RESERVE": 1000,
+        "COUNT_TOKENS": False,
+        "FREE_TPM_LIMIT": 250000,
+        "FREE_DAILY_TOKENS": 0,
+        "PAID_DAILY_TOKENS": 0,
+        "PAID_DAILY_USD": 0.0,
+        "PRICE_INPUT_PER_M": 1.0,
+        "PRICE_OUTPUT_PER_M": 1.0,
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(settings, name, value)
+    return settings
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return Registry(str(tmp_path / "registry.json"))
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    FakeClient.calls = []
+    FakeClient.counted_tokens = None
+    monkeypatch.setattr(analyzer_module.genai, "Client", FakeClient)
+    return FakeClient
@@ -0,0 +1,73 @@
+import pytest
+from insightflow.core.analyzer import AudioAnalyzer, KeyExhaustedError, KeyManager
+from insightflow.core.budget import TIER_FREE, TIER_PAID
+from conftest import FREE_KEY, PAID_KEY
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "talk.mp3"
+    path.write_bytes(b"0" * 1024)
+    return path
+
+
+def test_get_next_key_paid_only_skips_free(budget_settings):
+    manager = KeyManager()
+    assert manager.get_next_key([TIER_PAID]) == PAID_KEY
+    assert manager.get_next_key() == FREE_KEY
+
+
+def test_returns_to_free_after_paid_routed_item(budget_settings, registry, fake_client, audio_file, monkeypatch):
+    analyzer = AudioAnalyzer(registry)
+    estimates = iter([10_000, 500_000, 10_000, 10_000])
+    monkeypatch.setattr(analyzer.governor, "estimate_tokens", lambda path, bitrate=None: next(estimates))
+
+    for _ in range(4):
+        assert analyzer.analyze(audio_file) == "report"
+
+    assert fake_client.calls == [FREE_KEY, PAID_KEY, FREE_KEY, FREE_KEY]
+    assert registry.get_usage(TIER_FREE)["requests"] == 3
+    assert registry.get_usage(TIER_PAID)["requests"] == 1
+
+
+def test_reroutes_after_token_count_mismatch(budget_settings, registry, fake_client, audio_file, monkeypatch):
+    budget_settings.COUNT_TOKENS = True
+    fake_client.counted_tokens = 500_000
+    analyzer = AudioAnalyzer(registry)
+    monkeypatch.setattr(analyzer.governor, "estimate_tokens", lambda path, bitrate=None: 10_000)
+
+    assert analyzer.analyze(audio_file) == "report"
+
+    assert fake_client.calls == [PAID_KEY]
+    assert registry.get_usage(TIER_FREE)["requests"] == 0
+    assert registry.get_usage(TIER_PAID)["requests"] == 1
+
+
+def test_records_thinking_tokens_as_output(budget_settings, registry, fake_client, audio_file):
+    AudioAnalyzer(registry).analyze(audio_file)
+    assert registry.get_usage(TIER_FREE)["tokens"] == 100 + 10 + 5
+
+
+def test_oversized_item_not_sent_to_free_key(budget_settings, registry, fake_client, audio_file, monkeypatch):
+    budget_settings.GOOGLE_KEYS_PAID = []
+    analyzer = AudioAnalyzer(registry)
+    monkeypatch.setattr(analyzer.governor, "estimate_tokens", lambda path, bitrate=None: 300_000)
+    budget_settings.FREE_TPM_LIMIT = 250_000
+
+    with pytest.raises(KeyExhaustedError):
+        analyzer.analyze(audio_file)
+    assert fake_client.calls == []
+
+
+def test_paid_spend_cap_enforced_when_free_keys_fail(budget_settings, registry, fake_client, audio_file, monkeypatch):
+    budget_settings.PAID_DAILY_USD = 1.0
+    registry.record_usage(TIER_PAID, 0, 0.999)
+    analyzer = AudioAnalyzer(registry)
+    analyzer.key_manager.mark_as_failed(FREE_KEY)
+    analyzer._rotate_client()
+    assert analyzer.current_tier == TIER_PAID
+
+    with pytest.raises(KeyExhaustedError):
+        analyzer.analyze(audio_file)
+    assert fake_client.calls == []
+    assert registry.get_usage(TIER_PAID)["cost_usd"] == 0.999
@@ -0,0 +1,64 @@
+import pytest
+from insightflow.core import budget
+from insightflow.core.budget import BudgetGovernor, BudgetExceededError, TIER_FREE, TIER_PAID
+
+
+@pytest.fixture
+def governor(budget_settings, registry):
+    return BudgetGovernor(registry)
+
+
+def test_free_tpm_cutoff_ignores_output_reserve(governor):
+    assert governor.fits(TIER_FREE, 250000)
+    assert not governor.fits(TIER_FREE, 250001)
+    assert governor.allowed_tiers(250001) == [TIER_PAID]
+
+
+def test_zero_budgets_are_unlimited(governor, registry):
+    registry.record_usage(TIER_FREE, 10_000_000)
+    registry.record_usage(TIER_PAID, 10_000_000, 1000.0)
+    assert governor.allowed_tiers(1000) == [TIER_FREE, TIER_PAID]
+
+
+def test_daily_token_cap(governor, registry, budget_settings):
+    budget_settings.FREE_DAILY_TOKENS = 10_000
+    assert governor.fits(TIER_FREE, 9000)
+    registry.record_usage(TIER_FREE, 5000)
+    # 5000 used + 5000 input + 1000 output reserve > 10000
+    assert not governor.fits(TIER_FREE, 5000)
+    assert governor.allowed_tiers(5000) == [TIER_PAID]
+
+
+def test_daily_usd_cap(governor, registry, budget_settings):
+    budget_settings.PAID_DAILY_USD = 1.0
+    registry.record_usage(TIER_PAID, 0, 0.99)
+    # (10000 input + 1000 reserve) * $1/M = $0.011
+    assert not governor.fits(TIER_PAID, 10_000)
+    assert governor.fits(TIER_PAID, 5000)
+
+
+def test_no_tier_fits_raises(governor, budget_settings):
+    budget_settings.PAID_DAILY_TOKENS = 100
+    with pytest.raises(BudgetExceededError):
+        governor.allowed_tiers(300_000)
+
+
+def test_fallback_uses_per_format_bitrate(governor, monkeypatch, tmp_path):
+    monkeypatch.setattr(budget, "probe_duration", lambda path: None)
+    wav = tmp_path / "talk.wav"
+    wav.write_bytes(b"0" * (1411000 // 8 * 60))  # one minute of CD audio
+    assert governor.estimate_tokens(wav) == 60 * 32
+
+
+def test_fallback_uses_caller_bitrate(governor, monkeypatch, tmp_path):
+    monkeypatch.setattr(budget, "probe_duration", lambda path: None)
+    download = tmp_path / "video.mp3"
+    download.write_bytes(b"0" * (64000 // 8 * 60))
+    assert governor.estimate_tokens(download, "64k") == 60 * 32
+
+
+def test_fallback_survives_malformed_bitrate(governor, monkeypatch, tmp_path, budget_settings):
+    monkeypatch.setattr(budget, "probe_duration", lambda path: None)
+    temp = tmp_path / "audio.mp3"
+    temp.write_bytes(b"0" * (128000 // 8 * 60))
+    assert governor.estimate_tokens(temp, "fast") == 60 * 32